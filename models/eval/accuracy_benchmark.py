@@ -3,7 +3,12 @@ GGUF Model Accuracy Evaluation Script with llama-cpp-python
 Measures semantic accuracy using sentence transformers
 """
 import os
-from benchmark_utils import ModelEvaluation, get_model_paths, load_qa_dataset
+
+# Cap OpenMP before torch/sentence-transformers import (it only takes effect
+# then) so PyTorch leaves the cores llama.cpp's n_threads=4 will occupy
+os.environ.setdefault('OMP_NUM_THREADS', str(max(1, (os.cpu_count() or 1) - 4)))
+
+from benchmark_utils import ModelEvaluation, get_model_paths, load_qa_dataset, model_cache, validate_and_size_models
 
 def main():
     """Run accuracy benchmark on models"""
@@ -15,7 +20,7 @@ def main():
     evaluator = ModelEvaluation(
         n_ctx=2048,
         n_threads=4,
-        n_gpu_layers=0,  # Set to 35 or more for GPU acceleration
+        n_gpu_layers=-1,  # Offload all layers; clamped to 0 on CPU-only builds
         similarity_model="all-MiniLM-L6-v2"  # Fast and efficient
     )
 
@@ -24,26 +29,46 @@ def main():
     qa_dataset = load_qa_dataset()
     print(f"Loaded {len(qa_dataset)} Q&A pairs\n")
 
+    # Encode ground-truth answers once, shared across all models
+    evaluator.precompute_expected(qa_dataset)
+
     # Evaluation settings
     similarity_threshold = 0.7  # Answers with similarity >= 0.7 are correct
     max_tokens = 256  # Maximum tokens per answer
     temperature = 0.1  # Low temperature for deterministic answers
 
-    # Run evaluation on all models
-    all_results = {}
-    for model_path in models:
-        if not os.path.exists(model_path):
-            print(f"Warning: Model not found: {model_path}")
-            continue
-        
-        results = evaluator.evaluate_model(
-            model_path=model_path,
+    # Run evaluation on all models that exist on disk (stats run
+    # concurrently and missing entries are warned about up front)
+    models = [path for path, _ in validate_and_size_models(models)]
+
+    # With EVAL_WORKERS > 1, models run concurrently in worker processes
+    # (one per GPU on multi-GPU machines)
+    num_workers = int(os.environ.get("EVAL_WORKERS", "1"))
+    if num_workers > 1:
+        all_results = evaluator.evaluate_models_parallel(
+            model_paths=models,
             qa_dataset=qa_dataset,
             similarity_threshold=similarity_threshold,
             max_tokens=max_tokens,
-            temperature=temperature
+            temperature=temperature,
+            num_workers=num_workers,
+            output_stream="accuracy_results.jsonl"
         )
-        all_results[model_path] = results
+    else:
+        all_results = {}
+        for model_path in models:
+            results = evaluator.evaluate_model(
+                model_path=model_path,
+                qa_dataset=qa_dataset,
+                similarity_threshold=similarity_threshold,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                output_stream="accuracy_results.jsonl"  # Partial results survive crashes
+            )
+            all_results[model_path] = results
+
+            # Free this model's RAM before loading the next one
+            model_cache.evict(model_path)
     
     # Display results
     evaluator.print_results(all_results, similarity_threshold)
@@ -1,40 +1,263 @@
+import llama_cpp
 from llama_cpp import Llama
 import time
 import psutil
 import os
+import sys
 import json
+import threading
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
-from sentence_transformers import SentenceTransformer, util
-import statistics
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, replace
+from sentence_transformers import SentenceTransformer
+import numpy as np
+import torch
 import re
 
-def get_model_paths() -> List[str]:
-    """Read relative model paths"""
+# msgspec and orjson parse/encode JSON several times faster than the stdlib
+# and serialize dataclasses directly without an asdict walk per record; fall
+# back silently when they aren't installed
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dump_json(data, output_file: str):
+    """
+    Serialize results to a pretty-printed JSON file.
+
+    Dataclass records are encoded straight from their fields in C when
+    msgspec or orjson is available; the stdlib fallback converts them
+    through asdict as it walks the structure.
+    """
+    if msgspec is not None:
+        with open(output_file, 'wb') as f:
+            f.write(msgspec.json.format(msgspec.json.encode(data), indent=2))
+    elif orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=asdict)
+
+# GGUF filename quantization tokens, e.g. Q4_K_M, Q5_K, Q8_0, F16
+_QUANT_RE = re.compile(r"(Q\d+(?:_K(?:_[SM])?)?(?:_[01])?|BF16|F16|F32)", re.IGNORECASE)
+
+def parse_quantization(model_path: str) -> str:
+    """Quantization type (e.g. Q4_K_M, Q8_0, F16) parsed from a GGUF filename"""
+    match = _QUANT_RE.search(os.path.basename(model_path))
+    return match.group(1).upper() if match else "unknown"
+
+def _prefer_variant(paths: List[str], quant: str) -> List[str]:
+    """Reduce model families with several quantizations to the given one"""
+    quant = quant.upper()
+    families: Dict[str, List[str]] = {}
+    for path in paths:
+        family = _QUANT_RE.sub('', os.path.basename(path))
+        families.setdefault(family, []).append(path)
+
+    selected = []
+    for variants in families.values():
+        preferred = [p for p in variants if parse_quantization(p) == quant]
+        selected.extend(preferred if preferred else variants)
+    return selected
+
+def get_model_paths(prefer_quant: Optional[str] = None,
+                    prefer_dtype: Optional[str] = None) -> List[str]:
+    """
+    Read relative model paths, skipping blank lines and # comments.
+
+    Args:
+        prefer_quant: When set (e.g. 'Q4_K_M'), model families listed with
+            several quantizations are reduced to the matching variant.
+            Q4_K_M is the usual speed/quality sweet spot; Q2_*/Q3_* degrade
+            quality too far to be worth the extra speed.
+        prefer_dtype: Like prefer_quant but for full-precision runs (e.g.
+            'BF16' to pick bf16 over f16 conversions on AVX512BF16 or
+            Ampere+ hardware, where it halves bandwidth at fp32 accuracy).
+    """
     with open('models.txt', 'r') as model_paths:
-        models = model_paths.read().splitlines()
-        return models
-    
+        paths = [line.strip() for line in model_paths
+                 if line.strip() and not line.startswith('#')]
+    for preferred in (prefer_quant, prefer_dtype):
+        if preferred is not None:
+            paths = _prefer_variant(paths, preferred)
+    return paths
+
+def validate_and_size_models(paths: List[str]) -> List[tuple]:
+    """
+    Stat candidate model paths concurrently, keeping the ones that exist.
+
+    Runs the existence checks through a small thread pool so a long
+    models.txt over slow storage (NFS, FUSE mounts) doesn't pay N
+    sequential stat round-trips at startup, and warns about missing
+    entries so typos surface before any model loads.
+
+    Returns:
+        List of (path, size_mb) tuples, in input order, for existing paths
+    """
+    def stat_one(path: str):
+        try:
+            return path, os.path.getsize(path) / (1024 * 1024)
+        except OSError:
+            return path, None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        sized = list(pool.map(stat_one, paths))
+
+    validated = []
+    for path, size_mb in sized:
+        if size_mb is None:
+            print(f"Warning: Model not found: {path}")
+        else:
+            validated.append((path, size_mb))
+    return validated
+
 def load_qa_dataset() -> List[Dict[str, str]]:
         """
         Load Q&A dataset from JSON file.
-        
+
         Expected format:
         [
             {"question": "What is...?", "answer": "..."},
             {"question": "Who was...?", "answer": "..."},
             ...
         ]
-        
+
         Args:
             json_path: Path to JSON file
-        
+
         Returns:
             List of question-answer dictionaries
         """
-        with open('evaluation_set.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
+        with open('evaluation_set.json', 'rb') as f:
+            raw = f.read()
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+def gpu_offload_supported() -> bool:
+    """Whether this llama-cpp-python build can offload layers to a GPU"""
+    try:
+        return bool(llama_cpp.llama_supports_gpu_offload())
+    except AttributeError:
+        # Very old llama-cpp-python builds predate this API
+        return False
+
+def resolve_n_gpu_layers(n_gpu_layers: int) -> int:
+    """
+    Clamp the requested GPU layer count to what the installed build supports.
+
+    Prints the outcome so users can confirm whether offload is actually in
+    effect, a common silent pitfall with CPU-only llama-cpp-python wheels.
+    """
+    if n_gpu_layers != 0 and not gpu_offload_supported():
+        print("GPU offload not supported by this llama-cpp-python build; running CPU-only")
+        return 0
+    if n_gpu_layers != 0:
+        print(f"GPU offload enabled (n_gpu_layers={n_gpu_layers})")
+    return n_gpu_layers
+
+# KV-cache dtype names mapped to ggml type constants; quantized caches
+# (q8_0/q4_0) trade accuracy for memory, bf16/f16 are lossless halvings of f32
+_KV_CACHE_TYPES = {
+    'f32': 'GGML_TYPE_F32',
+    'f16': 'GGML_TYPE_F16',
+    'bf16': 'GGML_TYPE_BF16',
+    'q8_0': 'GGML_TYPE_Q8_0',
+    'q4_0': 'GGML_TYPE_Q4_0',
+}
+
+def resolve_kv_cache_type(kv_cache_type: Optional[str]) -> Optional[int]:
+    """ggml type id for a KV-cache dtype name, or None for llama.cpp's default"""
+    if kv_cache_type is None:
+        return None
+    type_name = _KV_CACHE_TYPES.get(kv_cache_type.lower())
+    if type_name is None or not hasattr(llama_cpp, type_name):
+        print(f"KV-cache type {kv_cache_type!r} not supported by this build; using default")
+        return None
+    return getattr(llama_cpp, type_name)
+
+class LlamaModelCache:
+    """
+    Process-level cache of loaded Llama instances.
+
+    GGUF loads take seconds to tens of seconds, so running the resource and
+    accuracy benchmarks on the same model in one process should not pay the
+    load twice. Instances are keyed by (model_path, n_ctx, n_threads,
+    n_gpu_layers); callers evict a path once they are done with it to free
+    RAM before the next model loads.
+    """
+
+    def __init__(self):
+        self._models: Dict[tuple, Llama] = {}
+
+    def get(self, model_path: str, n_ctx: int, n_threads: int, n_gpu_layers: int,
+            tensor_split: Optional[List[float]] = None, main_gpu: int = 0,
+            n_batch: int = 512, type_kv: Optional[int] = None,
+            use_mlock: bool = False, use_mmap: bool = True,
+            draft_model=None) -> Llama:
+        """Return a cached Llama instance, loading it on first use"""
+        key = (model_path, n_ctx, n_threads, n_gpu_layers,
+               tuple(tensor_split) if tensor_split else None, main_gpu, n_batch,
+               type_kv, use_mlock, use_mmap, draft_model is not None)
+        if key not in self._models:
+            self._models[key] = Llama(
+                model_path=model_path,
+                n_ctx=n_ctx,
+                n_threads=n_threads,
+                n_gpu_layers=n_gpu_layers,
+                tensor_split=tensor_split,
+                main_gpu=main_gpu,
+                n_batch=n_batch,
+                type_k=type_kv,
+                type_v=type_kv,
+                use_mlock=use_mlock,
+                use_mmap=use_mmap,
+                draft_model=draft_model,
+                verbose=False
+            )
+        return self._models[key]
+
+    def evict(self, model_path: str):
+        """Drop all cached instances of a model path to free memory"""
+        for key in [k for k in self._models if k[0] == model_path]:
+            del self._models[key]
+
+    def clear(self):
+        """Drop every cached instance"""
+        self._models.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.clear()
+
+# Shared across ModelBenchmark and ModelEvaluation in this process
+model_cache = LlamaModelCache()
+
+def _score_arrays(results: List['EvaluationResult']) -> tuple:
+    """Similarity scores and correctness of a result list as NumPy arrays"""
+    scores = np.fromiter((r.similarity_score for r in results),
+                         dtype=np.float32, count=len(results))
+    correct = np.fromiter((r.correct for r in results), dtype=bool, count=len(results))
+    return scores, correct
+
+def _pairwise_cosine(embeddings1: torch.Tensor, embeddings2: torch.Tensor) -> List[float]:
+    """
+    Cosine similarity of matching rows, as one fused op and one host transfer.
+
+    Equivalent to util.cos_sim(embeddings1, embeddings2).diagonal() without
+    materializing the full N x N similarity matrix or syncing per element.
+    """
+    emb1 = torch.nn.functional.normalize(embeddings1.float(), dim=1)
+    emb2 = torch.nn.functional.normalize(embeddings2.float(), dim=1)
+    return (emb1 * emb2).sum(dim=1).cpu().tolist()
 
 @dataclass
 class BenchmarkResult:
@@ -49,6 +272,9 @@ class BenchmarkResult:
     peak_memory_mb: float
     prompt: str
     response: str
+    quantization: str = "unknown"
+    kv_dtype: str = "default"
+    n_reps: int = 1
 
 @dataclass
 class EvaluationResult:
@@ -70,23 +296,62 @@ class MMLUResult:
     correct: bool
 
 class ModelBenchmark:
-    def __init__(self, n_ctx: int = 2048, n_threads: int = 4, n_gpu_layers: int = 0):
+    def __init__(self, n_ctx: int = 2048, n_threads: int = 4, n_gpu_layers: int = -1,
+                 tensor_split: Optional[List[float]] = None, main_gpu: int = 0,
+                 n_batch: Optional[int] = None, kv_cache_type: Optional[str] = None,
+                 use_mlock: bool = True, use_mmap: bool = True):
         """
         Initialize benchmark configuration
-        
+
         Args:
             n_ctx: Context window size
             n_threads: Number of CPU threads
-            n_gpu_layers: Number of layers to offload to GPU (0 for CPU-only)
+            n_gpu_layers: Number of layers to offload to GPU (-1 for all,
+                0 for CPU-only; clamped to 0 on CPU-only builds)
+            tensor_split: Optional per-GPU fraction of layers for multi-GPU setups
+            main_gpu: GPU index holding the scratch buffers and small tensors
+            n_batch: Prompt prefill batch size; defaults to min(n_ctx, 2048)
+                so long prompts prefill in as few forward passes as possible
+            kv_cache_type: KV-cache dtype ('f32', 'f16', 'bf16', 'q8_0',
+                'q4_0'); None keeps llama.cpp's default
+            use_mlock: Pin the mmapped weights in RAM so the page cache
+                can't evict them between repetitions under memory pressure,
+                which would show up as TTFT variance
+            use_mmap: Map the weights instead of copying them into RAM
         """
         self.n_ctx = n_ctx
         self.n_threads = n_threads
-        self.n_gpu_layers = n_gpu_layers
+        self.n_gpu_layers = resolve_n_gpu_layers(n_gpu_layers)
+        self.tensor_split = tensor_split
+        self.main_gpu = main_gpu
+        self.n_batch = n_batch if n_batch is not None else min(n_ctx, 2048)
+        self.kv_cache_type = kv_cache_type
+        self._type_kv = resolve_kv_cache_type(kv_cache_type)
+        self.use_mlock = use_mlock
+        self.use_mmap = use_mmap
         self.process = psutil.Process(os.getpid())
     
     def get_memory_usage(self) -> float:
         """Get current memory usage in MB"""
         return self.process.memory_info().rss / 1024 / 1024
+
+    def get_peak_memory(self) -> float:
+        """
+        Get the OS-tracked peak memory usage of this process in MB.
+
+        The kernel maintains the high-water mark itself, so reading it once
+        after generation replaces any polling during the run.
+        """
+        try:
+            import resource
+        except ImportError:
+            # Windows has no resource module; psutil tracks the peak there
+            return self.process.memory_info().peak_wset / 1024 / 1024
+        ru_maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux but bytes on macOS
+        if sys.platform == 'darwin':
+            return ru_maxrss / 1024 / 1024
+        return ru_maxrss / 1024
     
     def get_model_size(self, model_path: str) -> float:
         """Get model file size in MB"""
@@ -94,10 +359,8 @@ class ModelBenchmark:
     
     @staticmethod
     def get_model_paths() -> List[str]:
-        """Read relative model paths"""
-        with open('models.txt', 'r') as model_paths:
-            models = model_paths.read().splitlines()
-            return models
+        """Read relative model paths, skipping blank lines and # comments"""
+        return get_model_paths()
     
     def benchmark_model(
         self, 
@@ -105,87 +368,139 @@ class ModelBenchmark:
         prompts: List[str],
         max_tokens: int = 128,
         temperature: float = 0.7,
-        repetitions: int = 3
+        min_reps: int = 2,
+        max_reps: int = 5,
+        target_stderr: float = 0.05,
+        llm: Optional[Llama] = None
     ) -> List[BenchmarkResult]:
         """
-        Benchmark a single model with multiple prompts
-        
+        Benchmark a single model with multiple prompts.
+
+        Each prompt is repeated until the tokens-per-second measurement is
+        stable — the relative standard error of the mean drops below
+        target_stderr — or max_reps is reached, so fast stable models stop
+        early while noisy ones get extra repetitions.
+
         Args:
             model_path: Path to GGUF model file
             prompts: List of prompts to test
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
-            repetitions: Number of times to run each prompt for averaging
-        
+            min_reps: Repetitions to always run before checking stability
+            max_reps: Upper bound on repetitions per prompt
+            target_stderr: Relative standard error of mean tokens/sec below
+                which a prompt's repetitions stop
+            llm: Optional preloaded Llama instance; loaded via the shared
+                model cache when omitted
+
         Returns:
             List of BenchmarkResult objects
         """
+        model_name = os.path.basename(model_path)
+
         print(f"\n{'='*80}")
-        print(f"Loading model: {os.path.basename(model_path)}")
+        print(f"Loading model: {model_name}")
         print(f"{'='*80}")
-        
+
         model_size = self.get_model_size(model_path)
+        quantization = parse_quantization(model_path)
         baseline_memory = self.get_memory_usage()
-        
-        # Load model
-        load_start = time.time()
-        llm = Llama(
-            model_path=model_path,
-            n_ctx=self.n_ctx,
-            n_threads=self.n_threads,
-            n_gpu_layers=self.n_gpu_layers,
-            verbose=False
-        )
-        load_time = time.time() - load_start
+
+        # Load model (instant when already cached or passed in)
+        load_start = time.perf_counter()
+        if llm is None:
+            llm = model_cache.get(model_path, self.n_ctx, self.n_threads, self.n_gpu_layers,
+                                  tensor_split=self.tensor_split, main_gpu=self.main_gpu,
+                                  n_batch=self.n_batch, type_kv=self._type_kv,
+                                  use_mlock=self.use_mlock, use_mmap=self.use_mmap)
+        load_time = time.perf_counter() - load_start
         print(f"Model loaded in {load_time:.2f}s")
         
         memory_after_load = self.get_memory_usage()
         model_memory = memory_after_load - baseline_memory
         print(f"Model memory usage: {model_memory:.2f} MB")
-        
+
+        # Warm up before timing anything: the first generation after a load
+        # pays one-time costs (page-faulting mmapped weights, kernel
+        # autotuning, KV-cache allocation) that would otherwise be charged
+        # to the first repetition's TTFT
+        _ = llm("Warmup.", max_tokens=4, temperature=0.0, echo=False)
+        llm.reset()
+
         results = []
         
         for prompt_idx, prompt in enumerate(prompts):
             print(f"\nPrompt {prompt_idx + 1}/{len(prompts)}: {prompt[:50]}...")
-            
+
             prompt_results = []
-            
-            for rep in range(repetitions):
-                print(f"  Repetition {rep + 1}/{repetitions}...", end=" ")
-                
-                start_time = time.time()
-                first_token_time = None
-                generated_text = ""
-                token_count = 0
+
+            # Welford running mean/variance of tokens/sec for the early exit
+            mean_tps = 0.0
+            m2_tps = 0.0
+
+            for rep in range(max_reps):
+                print(f"  Repetition {rep + 1}/{max_reps}...", end=" ")
+
+                # Start every repetition from an empty KV cache so none of
+                # them benefits from a previous run's cached prompt prefix
+                llm.reset()
+
                 memory_before = self.get_memory_usage()
-                peak_memory = memory_before
-                
-                # Stream tokens and measure TTFT
+
+                # Track this repetition's peak RSS by sampling on a
+                # background thread: ru_maxrss is a process-lifetime
+                # high-water mark, so it can't see a smaller model's peak
+                # once a bigger one has run in the same process
+                peak_sample = [memory_before]
+                stop_sampling = threading.Event()
+
+                def sample_peak():
+                    while not stop_sampling.is_set():
+                        peak_sample[0] = max(peak_sample[0], self.get_memory_usage())
+                        stop_sampling.wait(0.05)
+
+                sampler = threading.Thread(target=sample_peak, daemon=True)
+                sampler.start()
+
+                # Measure TTFT with a short streaming call that stops after
+                # the first token, so the timed run below stays free of
+                # per-token Python overhead
+                start_time = time.perf_counter()
+                first_token_time = None
                 for output in llm(
                     prompt,
-                    max_tokens=max_tokens,
+                    max_tokens=1,
                     temperature=temperature,
                     stream=True,
                     echo=False
                 ):
-                    if first_token_time is None:
-                        first_token_time = time.time() - start_time
-                    
-                    token_count += 1
-                    generated_text += output['choices'][0]['text']
-                    
-                    # Track peak memory
-                    current_memory = self.get_memory_usage()
-                    peak_memory = max(peak_memory, current_memory)
-                
-                total_time = time.time() - start_time
+                    first_token_time = time.perf_counter() - start_time
+                    break
+
+                # Measure total generation time with a single synchronous
+                # call; llama.cpp runs uninterrupted by the Python loop
+                start_time = time.perf_counter()
+                output = llm(
+                    prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    echo=False
+                )
+                total_time = time.perf_counter() - start_time
+
+                stop_sampling.set()
+                sampler.join()
+
+                # The response already counts the prompt tokens it evaluated,
+                # so no separate tokenize pass is needed
+                prompt_tokens = output['usage']['prompt_tokens']
+                token_count = output['usage']['completion_tokens']
+                generated_text = output['choices'][0]['text']
+                peak_memory = max(peak_sample[0], self.get_memory_usage())
                 memory_used = self.get_memory_usage() - memory_before
-                
-                # Get prompt token count (approximate)
-                prompt_tokens = len(llm.tokenize(prompt.encode('utf-8')))
-                
+
                 result = BenchmarkResult(
-                    model_name=os.path.basename(model_path),
+                    model_name=model_name,
                     model_size_mb=model_size,
                     prompt_tokens=prompt_tokens,
                     generated_tokens=token_count,
@@ -195,34 +510,94 @@ class ModelBenchmark:
                     memory_used_mb=memory_used,
                     peak_memory_mb=peak_memory - baseline_memory,
                     prompt=prompt,
-                    response=generated_text.strip()
+                    response=generated_text.strip(),
+                    quantization=quantization,
+                    kv_dtype=self.kv_cache_type or "default"
                 )
                 
                 prompt_results.append(result)
                 print(f"TTFT: {result.ttft_ms:.0f}ms, Speed: {result.tokens_per_second:.2f} t/s")
-            
-            # Average results for this prompt
-            avg_result = BenchmarkResult(
-                model_name=prompt_results[0].model_name,
-                model_size_mb=prompt_results[0].model_size_mb,
-                prompt_tokens=prompt_results[0].prompt_tokens,
-                generated_tokens=int(statistics.mean(r.generated_tokens for r in prompt_results)),
-                ttft_ms=statistics.mean(r.ttft_ms for r in prompt_results),
-                total_time_s=statistics.mean(r.total_time_s for r in prompt_results),
-                tokens_per_second=statistics.mean(r.tokens_per_second for r in prompt_results),
-                memory_used_mb=statistics.mean(r.memory_used_mb for r in prompt_results),
-                peak_memory_mb=statistics.mean(r.peak_memory_mb for r in prompt_results),
-                prompt=prompt_results[0].prompt,
-                response=prompt_results[0].response  # Use first response as example
-            )
-            
-            results.append(avg_result)
-        
-        # Cleanup
-        del llm
-        
+
+                n = rep + 1
+                delta = result.tokens_per_second - mean_tps
+                mean_tps += delta / n
+                m2_tps += delta * (result.tokens_per_second - mean_tps)
+                if n >= min_reps and n >= 2 and mean_tps > 0:
+                    stderr = (m2_tps / (n - 1) / n) ** 0.5
+                    if stderr / mean_tps < target_stderr:
+                        print(f"  Stable after {n} repetitions "
+                              f"(rel. stderr {stderr / mean_tps:.3f})")
+                        break
+
+            # Average the measured fields in one pass over the repetitions;
+            # identifying fields (name, size, prompt, first response as the
+            # example, ...) carry over from the first repetition unchanged
+            measured_fields = ('generated_tokens', 'ttft_ms', 'total_time_s',
+                               'tokens_per_second', 'memory_used_mb', 'peak_memory_mb')
+            sums = dict.fromkeys(measured_fields, 0.0)
+            for r in prompt_results:
+                for field in measured_fields:
+                    sums[field] += getattr(r, field)
+            averages = {field: total / len(prompt_results) for field, total in sums.items()}
+            averages['generated_tokens'] = int(averages['generated_tokens'])
+            averages['n_reps'] = len(prompt_results)
+
+            results.append(replace(prompt_results[0], **averages))
+
         return results
     
+    def benchmark_models_parallel(self, model_paths: List[str], prompts: List[str],
+                                  max_tokens: int = 128, temperature: float = 0.7,
+                                  min_reps: int = 2, max_reps: int = 5,
+                                  target_stderr: float = 0.05,
+                                  num_workers: int = 2) -> Dict[str, List[BenchmarkResult]]:
+        """
+        Benchmark several models concurrently across worker processes.
+
+        Each spawned worker loads and benchmarks one model at a time; on
+        multi-GPU machines workers are pinned round-robin via
+        CUDA_VISIBLE_DEVICES so each model binds to its own device. CPU
+        threads are divided among workers to avoid oversubscription. Note
+        that concurrent models sharing a host make the per-repetition
+        memory figures less isolated than a sequential run.
+
+        Args:
+            model_paths: GGUF model paths to benchmark
+            prompts: List of prompts to test
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            min_reps: Repetitions to always run before checking stability
+            max_reps: Upper bound on repetitions per prompt
+            target_stderr: Relative standard error of mean tokens/sec below
+                which a prompt's repetitions stop
+            num_workers: Number of concurrent worker processes
+
+        Returns:
+            Dictionary mapping each model path to its benchmark results
+        """
+        import multiprocessing as mp
+
+        bench_kwargs = dict(
+            n_ctx=self.n_ctx,
+            n_threads=max(1, (os.cpu_count() or num_workers) // num_workers),
+            n_gpu_layers=self.n_gpu_layers, tensor_split=self.tensor_split,
+            n_batch=self.n_batch, kv_cache_type=self.kv_cache_type,
+            use_mlock=self.use_mlock, use_mmap=self.use_mmap)
+
+        n_gpus = torch.cuda.device_count() if self.n_gpu_layers != 0 else 0
+        jobs = [
+            (model_path, prompts, max_tokens, temperature,
+             (min_reps, max_reps, target_stderr), bench_kwargs,
+             idx % n_gpus if n_gpus > 1 else None)
+            for idx, model_path in enumerate(model_paths)
+        ]
+
+        all_results = {}
+        with mp.get_context('spawn').Pool(num_workers) as pool:
+            for model_path, results in pool.imap_unordered(_benchmark_worker, jobs):
+                all_results[model_path] = results
+        return all_results
+
     def print_results(self, all_results: Dict[str, List[BenchmarkResult]]):
         """Print formatted benchmark results"""
         print(f"\n{'='*80}")
@@ -241,9 +616,14 @@ class ModelBenchmark:
                 print(f"{prompt_preview:<40} {result.ttft_ms:<12.0f} {result.tokens_per_second:<12.2f} {result.peak_memory_mb:<12.0f}")
             
             # Calculate averages
-            avg_ttft = statistics.mean(r.ttft_ms for r in results)
-            avg_speed = statistics.mean(r.tokens_per_second for r in results)
-            avg_memory = statistics.mean(r.peak_memory_mb for r in results)
+            # One pass over the results instead of three generator walks
+            s_ttft = s_speed = s_mem = 0.0
+            for r in results:
+                s_ttft += r.ttft_ms
+                s_speed += r.tokens_per_second
+                s_mem += r.peak_memory_mb
+            n = len(results)
+            avg_ttft, avg_speed, avg_memory = s_ttft / n, s_speed / n, s_mem / n
             
             print(f"-" * 80)
             print(f"{'AVERAGE':<40} {avg_ttft:<12.0f} {avg_speed:<12.2f} {avg_memory:<12.0f}")
@@ -251,14 +631,8 @@ class ModelBenchmark:
     
     def save_results(self, all_results: Dict[str, List[BenchmarkResult]], output_file: str):
         """Save results to JSON file"""
-        json_results = {
-            model: [asdict(r) for r in results]
-            for model, results in all_results.items()
-        }
-        
-        with open(output_file, 'w') as f:
-            json.dump(json_results, f, indent=2)
-        
+        _dump_json(all_results, output_file)
+
         print(f"\nResults saved to: {output_file}")
     
     def compare_models(self, all_results: Dict[str, List[BenchmarkResult]]):
@@ -272,152 +646,649 @@ class ModelBenchmark:
         
         for model_path, results in all_results.items():
             model_name = os.path.basename(model_path)[:28]
-            avg_ttft = statistics.mean(r.ttft_ms for r in results)
-            avg_speed = statistics.mean(r.tokens_per_second for r in results)
-            avg_memory = statistics.mean(r.peak_memory_mb for r in results)
+            # One pass over the results instead of three generator walks
+            s_ttft = s_speed = s_mem = 0.0
+            for r in results:
+                s_ttft += r.ttft_ms
+                s_speed += r.tokens_per_second
+                s_mem += r.peak_memory_mb
+            n = len(results)
+            avg_ttft, avg_speed, avg_memory = s_ttft / n, s_speed / n, s_mem / n
             
             print(f"{model_name:<30} {avg_ttft:<15.0f} {avg_speed:<15.2f} {avg_memory:<15.0f}")
 
 class ModelEvaluation:
-    def __init__(self, n_ctx: int = 2048, n_threads: int = 4, n_gpu_layers: int = 0, similarity_model: str = "all-MiniLM-L6-v2"):
+    def __init__(self, n_ctx: int = 2048, n_threads: int = 4, n_gpu_layers: int = -1,
+                 similarity_model: str = "all-MiniLM-L6-v2", batch_size: int = 64,
+                 tensor_split: Optional[List[float]] = None, n_parallel: int = 1,
+                 quantize_similarity: bool = True, speculative: bool = False):
         """
         Initialize evaluation configuration
-        
+
         Args:
-            n_ctx: Context window size
+            n_ctx: Context window size (per sequence; the context is sized as
+                n_ctx * n_parallel when batching)
             n_threads: Number of CPU threads
-            n_gpu_layers: Number of layers to offload to GPU (0 for CPU-only)
+            n_gpu_layers: Number of layers to offload to GPU (-1 for all,
+                0 for CPU-only; clamped to 0 on CPU-only builds)
             similarity_model: Sentence transformer model for semantic similarity
+            batch_size: Encoding batch size for the similarity model; larger
+                values saturate the device better on big evaluation sets
+            tensor_split: Optional per-GPU fraction of layers for multi-GPU setups
+            n_parallel: Number of questions decoded concurrently through
+                llama.cpp's batch API (1 = serial generation)
+            quantize_similarity: Run the similarity model in int8 on CPU
+                (dynamic quantization) or fp16 on GPU for faster encoding
+            speculative: Speed up decoding with prompt-lookup speculation,
+                where draft tokens copied from the prompt are verified in a
+                single forward pass (serial generation only)
         """
         self.n_ctx = n_ctx
         self.n_threads = n_threads
-        self.n_gpu_layers = n_gpu_layers
+        self.n_gpu_layers = resolve_n_gpu_layers(n_gpu_layers)
+        self.tensor_split = tensor_split
+        self.batch_size = batch_size
+        self.n_parallel = n_parallel
+        self._speculative = speculative
+
+        # Leave llama.cpp's cores alone: cap torch's intra-op pool to the
+        # CPUs that generation isn't using, so the two runtimes don't fight
+        # over cores when they overlap
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) - n_threads))
+
+        if speculative:
+            from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+            self.draft_model = LlamaPromptLookupDecoding(num_pred_tokens=10)
+        else:
+            self.draft_model = None
 
-        # Load sentence transformer for semantic similarity
-        print(f"Loading sentence transformer: {similarity_model}")
-        self.similarity_model = SentenceTransformer(similarity_model)
+        # The sentence transformer loads lazily so generation-only worker
+        # processes never pay for it (see evaluate_models_parallel)
+        self._similarity_model_name = similarity_model
+        self._quantize_similarity = quantize_similarity
+        self._similarity_model: Optional[SentenceTransformer] = None
+
+        # Expected-answer embeddings, keyed by dataset identity so they are
+        # encoded once and reused across every model being evaluated
+        self._expected_emb_cache: Dict[int, torch.Tensor] = {}
+
+    @property
+    def similarity_model(self) -> SentenceTransformer:
+        """Sentence transformer for semantic similarity, loaded on first use"""
+        if self._similarity_model is None:
+            print(f"Loading sentence transformer: {self._similarity_model_name}")
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            model = SentenceTransformer(self._similarity_model_name, device=device)
+
+            # Cosine similarity is insensitive to the small precision loss
+            # from int8/fp16, and the encode step runs roughly 2-4x faster
+            if self._quantize_similarity:
+                if device == 'cuda':
+                    model = model.half()
+                else:
+                    model = torch.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._similarity_model = model
+        return self._similarity_model
+
+    def precompute_expected(self, qa_dataset: List[Dict[str, str]]) -> torch.Tensor:
+        """
+        Encode the expected answers of a Q&A dataset once and cache the result.
+
+        Call this before evaluating multiple models on the same dataset so the
+        ground-truth embeddings are not recomputed per model.
+
+        Args:
+            qa_dataset: List of Q&A pairs
+
+        Returns:
+            Tensor of expected-answer embeddings, one row per pair
+        """
+        key = id(qa_dataset)
+        if key not in self._expected_emb_cache:
+            self._expected_emb_cache[key] = self.similarity_model.encode(
+                [qa['answer'] for qa in qa_dataset],
+                batch_size=self.batch_size, convert_to_tensor=True, show_progress_bar=False)
+        return self._expected_emb_cache[key]
     
+    # Stop sequences applied to every generated answer
+    STOP_SEQUENCES = ["Question:", "\n\n"]
+
+    # llama.cpp's default sampler settings, mirrored by the batched path so
+    # answers don't depend on whether n_parallel is 1 or not
+    TOP_K = 40
+    TOP_P = 0.95
+    MIN_P = 0.05
+    REPEAT_PENALTY = 1.1
+    REPEAT_LAST_N = 64
+
+    # Shared prompt template pieces; the question slots between them. Kept
+    # separate so the fixed parts can be tokenized once per model.
+    QA_PROMPT_PREFIX = "Answer the following question concisely and accurately.\nQuestion: "
+    QA_PROMPT_SUFFIX = "\nAnswer:"
+
+    def format_qa_prompt(self, question: str) -> str:
+        """Build the instruction prompt for a single question"""
+        return f"{self.QA_PROMPT_PREFIX}{question}{self.QA_PROMPT_SUFFIX}"
+
     def generate_answer(self, llm: Llama, question: str, max_tokens: int = 256, temperature: float = 0.1) -> str:
         """
         Generate an answer for a given question.
-        
+
         Args:
             question: The question to answer
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature (lower = more deterministic)
-        
+
         Returns:
             Generated answer string
         """
-        prompt = f"""Answer the following question concisely and accurately.
-                    Question: {question}
-                    Answer:"""
-        
         output = llm(
-            prompt, 
-            max_tokens=max_tokens, 
-            temperature=temperature, 
-            stop=["Question:", "\n\n"],
+            self.format_qa_prompt(question),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=self.STOP_SEQUENCES,
             echo=False)
-        
+
         answer = output['choices'][0]['text'].strip()
         return answer
+
+    @staticmethod
+    def _answer_token_budget(llm: Llama, expected_answer: str) -> int:
+        """
+        Token cap for a question, derived from its reference answer.
+
+        Decode time scales with tokens generated, and a correct answer has no
+        reason to run much past the ground truth's length, so allow twice the
+        reference length (with a small floor for very short answers).
+        """
+        answer_len = len(llm.tokenize(expected_answer.encode('utf-8'), add_bos=False))
+        return max(16, 2 * answer_len)
+
+    def _generate_from_tokens(self, llm: Llama, prompt_tokens: List[int],
+                              max_tokens: int, temperature: float) -> str:
+        """Generate an answer from an already tokenized prompt"""
+        output = llm(
+            prompt_tokens,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=self.STOP_SEQUENCES,
+            echo=False)
+
+        return output['choices'][0]['text'].strip()
+
+    @staticmethod
+    def _clear_kv_cache(llm: Llama):
+        """Clear every sequence from the context's KV cache"""
+        ctx = llm._ctx.ctx if hasattr(llm, '_ctx') else llm.ctx
+        if hasattr(llama_cpp, 'llama_kv_self_clear'):
+            llama_cpp.llama_kv_self_clear(ctx)
+        else:
+            llama_cpp.llama_kv_cache_clear(ctx)
+        llm.reset()
+
+    def _sample_token(self, logits: np.ndarray, temperature: float,
+                      recent_tokens: List[int]) -> int:
+        """
+        Sample from raw logits with llama.cpp's default sampler settings.
+
+        Applies the repeat penalty over the last REPEAT_LAST_N tokens, then
+        top-k, min-p, and top-p filtering before the temperature draw, so
+        the batched path samples from (near) the same distribution as
+        create_completion's defaults on the serial path.
+        """
+        # Copy before mutating: the caller's array is a view into llama.cpp
+        # context memory
+        logits = logits.astype(np.float32, copy=True)
+        if recent_tokens:
+            recent = np.unique(recent_tokens[-self.REPEAT_LAST_N:])
+            penalized = logits[recent]
+            logits[recent] = np.where(penalized > 0,
+                                      penalized / self.REPEAT_PENALTY,
+                                      penalized * self.REPEAT_PENALTY)
+
+        if temperature <= 0:
+            return int(np.argmax(logits))
+
+        top_k = min(self.TOP_K, logits.size)
+        candidates = np.argpartition(logits, -top_k)[-top_k:]
+        scaled = logits[candidates] / temperature
+        probs = np.exp(scaled - scaled.max())
+        probs /= probs.sum()
+
+        order = np.argsort(probs)[::-1]
+        candidates, probs = candidates[order], probs[order]
+
+        # min-p: drop candidates far less likely than the best one
+        keep = probs >= self.MIN_P * probs[0]
+        candidates, probs = candidates[keep], probs[keep]
+
+        # top-p: keep the smallest prefix covering TOP_P probability mass
+        cutoff = int(np.searchsorted(np.cumsum(probs), self.TOP_P)) + 1
+        candidates, probs = candidates[:cutoff], probs[:cutoff]
+
+        probs /= probs.sum()
+        return int(np.random.choice(candidates, p=probs))
+
+    def _generate_answers_batched(self, llm: Llama, prompts: List[str],
+                                  max_tokens: int, temperature: float) -> List[str]:
+        """
+        Decode several prompts concurrently through llama.cpp's batch API.
+
+        Token generation is memory-bandwidth-bound, so stepping N sequences
+        per forward pass reuses the weight stream that a single sequence
+        would leave mostly idle. Stop sequences and EOS are applied per
+        sequence, matching generate_answer.
+
+        Args:
+            llm: Loaded model whose context holds len(prompts) sequences
+            prompts: Fully formatted prompts, one per sequence
+            max_tokens: Maximum tokens to generate per prompt
+            temperature: Sampling temperature (0 for greedy)
+
+        Returns:
+            Generated answer strings in prompt order
+        """
+        # Start from an empty KV cache: llm.reset() alone leaves earlier
+        # cells (e.g. the warmup's, tagged sequence 0) in the context, and
+        # unlike the high-level generate path nothing below removes them
+        # before decoding, so sequence 0 would attend to stale positions
+        self._clear_kv_cache(llm)
+
+        ctx = llm._ctx.ctx if hasattr(llm, '_ctx') else llm.ctx
+        n_seq = len(prompts)
+        tokens_per_seq = [llm.tokenize(p.encode('utf-8')) for p in prompts]
+        n_vocab = llm.n_vocab()
+        eos_token = llm.token_eos()
+
+        # llama.cpp rejects any decode larger than the context's n_batch,
+        # so prefill must be submitted in slices of at most that many tokens
+        n_batch = llm.n_batch
+        batch = llama_cpp.llama_batch_init(max(n_seq, n_batch), 0, n_seq)
+
+        # Accumulate raw bytes per sequence: multi-byte UTF-8 characters can
+        # span token boundaries, so decoding token-by-token would drop them
+        byte_texts = [bytearray() for _ in range(n_seq)]
+        stop_bytes = [stop.encode('utf-8') for stop in self.STOP_SEQUENCES]
+        # Prompt tokens seed the repeat-penalty window, as in llama.cpp
+        recent_tokens = [list(t) for t in tokens_per_seq]
+        positions = [len(t) for t in tokens_per_seq]
+        finished = [False] * n_seq
+        logits_row = [0] * n_seq
+
+        try:
+            # Prefill everything but each prompt's final token in
+            # n_batch-sized slices; no logits are needed for these rows
+            flat = [(tok, pos, seq)
+                    for seq, tokens in enumerate(tokens_per_seq)
+                    for pos, tok in enumerate(tokens[:-1])]
+            for start in range(0, len(flat), n_batch):
+                rows = flat[start:start + n_batch]
+                for n, (tok, pos, seq) in enumerate(rows):
+                    batch.token[n] = tok
+                    batch.pos[n] = pos
+                    batch.n_seq_id[n] = 1
+                    batch.seq_id[n][0] = seq
+                    batch.logits[n] = 0
+                batch.n_tokens = len(rows)
+                if llama_cpp.llama_decode(ctx, batch) != 0:
+                    raise RuntimeError("llama_decode failed during batched prefill")
+
+            # Decode every prompt's final token together: logits only
+            # survive the most recent llama_decode call, so gathering the
+            # last tokens into one batch yields every sequence's first-token
+            # logits at once regardless of how the prefill was sliced
+            for n, tokens in enumerate(tokens_per_seq):
+                batch.token[n] = tokens[-1]
+                batch.pos[n] = len(tokens) - 1
+                batch.n_seq_id[n] = 1
+                batch.seq_id[n][0] = n
+                batch.logits[n] = 1
+                logits_row[n] = n
+            batch.n_tokens = n_seq
+            if llama_cpp.llama_decode(ctx, batch) != 0:
+                raise RuntimeError("llama_decode failed during batched prefill")
+
+            for _ in range(max_tokens):
+                # Sample the next token of every live sequence
+                sampled = {}
+                for seq in range(n_seq):
+                    if finished[seq]:
+                        continue
+                    logits_ptr = llama_cpp.llama_get_logits_ith(ctx, logits_row[seq])
+                    logits = np.ctypeslib.as_array(logits_ptr, shape=(n_vocab,))
+                    token = self._sample_token(logits, temperature, recent_tokens[seq])
+
+                    if token == eos_token:
+                        finished[seq] = True
+                        continue
+
+                    recent_tokens[seq].append(token)
+
+                    byte_texts[seq] += llm.detokenize([token])
+                    for stop in stop_bytes:
+                        cut = byte_texts[seq].find(stop)
+                        if cut != -1:
+                            del byte_texts[seq][cut:]
+                            finished[seq] = True
+                            break
+                    else:
+                        sampled[seq] = token
+
+                if not sampled:
+                    break
+
+                # One decode step advances every live sequence together
+                n = 0
+                for seq, token in sampled.items():
+                    batch.token[n] = token
+                    batch.pos[n] = positions[seq]
+                    batch.n_seq_id[n] = 1
+                    batch.seq_id[n][0] = seq
+                    batch.logits[n] = 1
+                    logits_row[seq] = n
+                    positions[seq] += 1
+                    n += 1
+                batch.n_tokens = n
+                if llama_cpp.llama_decode(ctx, batch) != 0:
+                    raise RuntimeError("llama_decode failed during batched generation")
+        finally:
+            llama_cpp.llama_batch_free(batch)
+            self._clear_kv_cache(llm)
+
+        # Decode each answer once at the end; only a character cut off by
+        # the token budget can still be incomplete here
+        return [bytes(text).decode('utf-8', errors='ignore').strip()
+                for text in byte_texts]
         
+    def compute_semantic_similarities(self, texts1: List[str], texts2: List[str]) -> List[float]:
+        """
+        Compute pairwise semantic similarity between two lists of texts.
+
+        Encoding is done in batches so the transformer runs a few large
+        forward passes instead of one per text. sentence-transformers sorts
+        each list by length internally, so batches are padded to similar
+        lengths rather than the longest text overall.
+
+        Args:
+            texts1: First list of texts (predicted answers)
+            texts2: Second list of texts (expected answers), same length
+
+        Returns:
+            List of cosine similarity scores (0 to 1), one per pair
+        """
+        # Encode all texts in batches
+        embeddings1 = self.similarity_model.encode(
+            texts1, batch_size=self.batch_size, convert_to_tensor=True, show_progress_bar=False)
+        embeddings2 = self.similarity_model.encode(
+            texts2, batch_size=self.batch_size, convert_to_tensor=True, show_progress_bar=False)
+
+        # Compute all cosine similarities at once: row-wise dot products on
+        # normalized embeddings avoid the N x N matrix that cos_sim builds,
+        # and a single host transfer replaces one .item() sync per pair
+        return _pairwise_cosine(embeddings1, embeddings2)
+
     def compute_semantic_similarity(self, text1: str, text2: str) -> float:
         """
         Compute semantic similarity between two texts using sentence transformers.
-        
+
         Args:
             text1: First text (predicted answer)
             text2: Second text (expected answer)
-        
+
         Returns:
             Cosine similarity score (0 to 1)
         """
-        # Encode both texts
-        embedding1 = self.similarity_model.encode(text1, convert_to_tensor=True)
-        embedding2 = self.similarity_model.encode(text2, convert_to_tensor=True)
-        
-        # Compute cosine similarity
-        similarity = util.cos_sim(embedding1, embedding2).item()
-        return similarity
+        return self.compute_semantic_similarities([text1], [text2])[0]
     
+    def generate_predictions(self, model_path: str, qa_dataset: List[Dict[str, str]],
+                             max_tokens: int = 256, temperature: float = 0.1,
+                             llm: Optional[Llama] = None, on_progress=None) -> List[str]:
+        """
+        Generate an answer for every question in the dataset with one model.
+
+        This is the generation half of evaluate_model; it never touches the
+        similarity model, so worker processes can run it without loading the
+        sentence transformer.
+
+        Args:
+            model_path: Path to GGUF model
+            qa_dataset: List of Q&A pairs
+            max_tokens: Maximum tokens to generate per answer
+            temperature: Sampling temperature
+            llm: Optional preloaded Llama instance; loaded via the shared
+                model cache when omitted
+            on_progress: Optional callback invoked with the growing answer
+                list after each generation step
+
+        Returns:
+            Predicted answer strings in dataset order
+        """
+        # Load model (instant when already cached or passed in)
+        print(f"\n{'='*80}")
+        print(f"Loading model: {os.path.basename(model_path)}")
+        print(f"{'='*80}")
+
+        if llm is None:
+            # Reserve a full context window per concurrent sequence
+            llm = model_cache.get(model_path, self.n_ctx * self.n_parallel,
+                                  self.n_threads, self.n_gpu_layers,
+                                  tensor_split=self.tensor_split,
+                                  draft_model=self.draft_model)
+
+        # Warm up so the first question doesn't absorb one-time load costs
+        _ = llm("Warmup.", max_tokens=4, temperature=0.0, echo=False)
+        llm.reset()
+
+        total = len(qa_dataset)
+        print(f"Evaluating on {total} questions...")
+        print("-" * 80)
+
+        predicted_answers = []
+        if self.n_parallel > 1:
+            # Decode up to n_parallel questions per forward pass
+            for chunk_start in range(0, total, self.n_parallel):
+                chunk = qa_dataset[chunk_start:chunk_start + self.n_parallel]
+                prompts = [self.format_qa_prompt(qa['question']) for qa in chunk]
+                chunk_max_tokens = min(max_tokens, max(
+                    self._answer_token_budget(llm, qa['answer']) for qa in chunk))
+                predicted_answers.extend(
+                    self._generate_answers_batched(llm, prompts, chunk_max_tokens, temperature))
+                if on_progress is not None:
+                    on_progress(predicted_answers)
+                print(f"Progress: {len(predicted_answers)}/{total} answers generated")
+        else:
+            # Tokenize the fixed template pieces once per model; each
+            # question only needs a tokenizer pass over its own text
+            prefix_ids = llm.tokenize(self.QA_PROMPT_PREFIX.encode('utf-8'))
+            suffix_ids = llm.tokenize(self.QA_PROMPT_SUFFIX.encode('utf-8'), add_bos=False)
+
+            # Prefill the shared prefix once and snapshot the context;
+            # restoring it per question means the template's KV cache is
+            # computed exactly once per model
+            llm.reset()
+            llm.eval(prefix_ids)
+            prefix_state = llm.save_state()
+
+            for i, qa_pair in enumerate(qa_dataset, 1):
+                question_ids = llm.tokenize(qa_pair['question'].encode('utf-8'), add_bos=False)
+                question_max_tokens = min(
+                    max_tokens, self._answer_token_budget(llm, qa_pair['answer']))
+                llm.load_state(prefix_state)
+                predicted_answers.append(self._generate_from_tokens(
+                    llm, prefix_ids + question_ids + suffix_ids, question_max_tokens, temperature))
+                if on_progress is not None:
+                    on_progress(predicted_answers)
+
+                # Progress update
+                if i % 10 == 0 or i == total:
+                    print(f"Progress: {i}/{total} answers generated")
+
+        return predicted_answers
+
     def evaluate_model(self, model_path: str, qa_dataset: List[Dict[str, str]], similarity_threshold: float = 0.7,
-                       max_tokens: int = 256, temperature: float = 0.1) -> List[EvaluationResult]:
+                       max_tokens: int = 256, temperature: float = 0.1,
+                       llm: Optional[Llama] = None,
+                       output_stream: Optional[str] = None) -> List[EvaluationResult]:
         """
         Evaluate a single model on the Q&A dataset using semantic similarity.
-        
+
         Args:
             model_path: Path to GGUF model
             qa_dataset: List of Q&A pairs
             similarity_threshold: Minimum similarity score to consider correct (0-1)
-        
+            llm: Optional preloaded Llama instance; loaded via the shared
+                model cache when omitted
+            output_stream: Optional JSONL path; each result is appended as it
+                is scored so partial results survive a crash mid-run
+
         Returns:
             Dictionary with evaluation results
         """
-        # Load model
-        print(f"\n{'='*80}")
-        print(f"Loading model: {os.path.basename(model_path)}")
-        print(f"{'='*80}")
+        print(f"Similarity threshold: {similarity_threshold}")
 
-        llm = Llama(
-                model_path=model_path,
-                n_ctx=self.n_ctx,
-                n_threads=self.n_threads,
-                n_gpu_layers=self.n_gpu_layers,
-                verbose=False
-            )
-        
+        # Encode predictions as they become ready: a single background worker
+        # runs the MiniLM forward passes (which release the GIL inside torch)
+        # while llama.cpp keeps decoding, so encoding hides behind generation
+        embed_futures = []
+        submitted = 0
+
+        def submit_ready(answers, final: bool = False):
+            nonlocal submitted
+            while (len(answers) - submitted >= self.batch_size
+                   or (final and submitted < len(answers))):
+                batch = answers[submitted:submitted + self.batch_size]
+                embed_futures.append(embed_worker.submit(
+                    self.similarity_model.encode, batch, batch_size=self.batch_size,
+                    convert_to_tensor=True, show_progress_bar=False))
+                submitted += len(batch)
+
+        with ThreadPoolExecutor(max_workers=1) as embed_worker:
+            predicted_answers = self.generate_predictions(
+                model_path, qa_dataset, max_tokens, temperature,
+                llm=llm, on_progress=submit_ready)
+            submit_ready(predicted_answers, final=True)
+
+        predicted_emb = torch.cat([future.result() for future in embed_futures])
+        return self.score_predictions(model_path, qa_dataset, predicted_answers,
+                                      similarity_threshold, predicted_emb=predicted_emb,
+                                      output_stream=output_stream)
+
+    def score_predictions(self, model_path: str, qa_dataset: List[Dict[str, str]],
+                          predicted_answers: List[str], similarity_threshold: float = 0.7,
+                          predicted_emb: Optional[torch.Tensor] = None,
+                          output_stream: Optional[str] = None) -> List[EvaluationResult]:
+        """
+        Score generated answers against the dataset's reference answers.
+
+        Args:
+            model_path: Path to the GGUF model that produced the answers
+            qa_dataset: List of Q&A pairs
+            predicted_answers: Generated answers in dataset order
+            similarity_threshold: Minimum similarity score to consider correct (0-1)
+            predicted_emb: Optional precomputed embeddings of the predictions;
+                encoded here when omitted
+            output_stream: Optional JSONL path; each result is appended as it
+                is scored
+
+        Returns:
+            List of EvaluationResult objects
+        """
         model_name = os.path.basename(model_path)
-        correct = 0
         total = len(qa_dataset)
-        results = []
-        similarity_scores = []
 
-        print(f"Evaluating on {total} questions...")
-        print(f"Similarity threshold: {similarity_threshold}")
-        print("-" * 80)
+        # Score all pairs at once, reusing the cached ground-truth
+        # embeddings across models
+        expected_emb = self.precompute_expected(qa_dataset)
+        if predicted_emb is None:
+            predicted_emb = self.similarity_model.encode(
+                predicted_answers, batch_size=self.batch_size,
+                convert_to_tensor=True, show_progress_bar=False)
+        similarity_scores = _pairwise_cosine(predicted_emb, expected_emb)
 
-        for i, qa_pair in enumerate(qa_dataset, 1):
-            question = qa_pair['question']
-            expected_answer = qa_pair['answer']
-            
-            # Generate prediction
-            predicted_answer = self.generate_answer(llm, question, max_tokens, temperature)
-            
-            # Compute semantic similarity
-            similarity = self.compute_semantic_similarity(predicted_answer, expected_answer)
-            similarity_scores.append(similarity)
-            
+        stream = open(output_stream, 'a', encoding='utf-8') if output_stream else None
+
+        correct = 0
+        results = []
+        for qa_pair, predicted_answer, similarity in zip(qa_dataset, predicted_answers, similarity_scores):
             # Check if correct based on threshold
             is_correct = similarity >= similarity_threshold
-            
+
             if is_correct:
                 correct += 1
-            
+
             # Store result
             result = EvaluationResult(
                 model_name=model_name,
-                question=question,
-                expected_answer=expected_answer,
+                question=qa_pair['question'],
+                expected_answer=qa_pair['answer'],
                 predicted_answer=predicted_answer,
                 similarity_score=float(similarity),
                 correct=is_correct
             )
             results.append(result)
 
-            # Progress update
-            if i % 10 == 0 or i == total:
-                current_acc = (correct / i) * 100
-                avg_sim = statistics.mean(similarity_scores)
-                print(f"Progress: {i}/{total} | Accuracy: {current_acc:.2f}% | Avg Similarity: {avg_sim:.3f}")
+            if stream is not None:
+                json.dump(asdict(result), stream)
+                stream.write('\n')
 
-        # Cleanup
-        del llm
+        if stream is not None:
+            stream.close()
+
+        accuracy = (correct / total * 100) if total > 0 else 0
+        avg_sim = np.mean(similarity_scores) if similarity_scores else 0
+        print(f"{model_name} | Accuracy: {accuracy:.2f}% | Avg Similarity: {avg_sim:.3f}")
 
         return results
-    
-    def print_results(self, all_results: Dict[str, List[EvaluationResult]], 
+
+    def evaluate_models_parallel(self, model_paths: List[str], qa_dataset: List[Dict[str, str]],
+                                 similarity_threshold: float = 0.7, max_tokens: int = 256,
+                                 temperature: float = 0.1, num_workers: int = 2,
+                                 output_stream: Optional[str] = None) -> Dict[str, List[EvaluationResult]]:
+        """
+        Evaluate several models concurrently across worker processes.
+
+        Each spawned worker generates predictions for one model at a time
+        (without ever loading the sentence transformer) and sends the strings
+        back; the parent scores them against the shared ground-truth
+        embeddings. On multi-GPU machines the workers are pinned round-robin
+        via CUDA_VISIBLE_DEVICES so each model binds to its own device.
+
+        Args:
+            model_paths: GGUF model paths to evaluate
+            qa_dataset: List of Q&A pairs
+            similarity_threshold: Minimum similarity score to consider correct (0-1)
+            max_tokens: Maximum tokens to generate per answer
+            temperature: Sampling temperature
+            num_workers: Number of concurrent worker processes
+            output_stream: Optional JSONL path for incremental results
+
+        Returns:
+            Dictionary mapping each model path to its evaluation results
+        """
+        import multiprocessing as mp
+
+        eval_kwargs = dict(
+            n_ctx=self.n_ctx, n_threads=self.n_threads, n_gpu_layers=self.n_gpu_layers,
+            tensor_split=self.tensor_split, n_parallel=self.n_parallel,
+            speculative=self._speculative)
+
+        n_gpus = torch.cuda.device_count() if self.n_gpu_layers != 0 else 0
+        jobs = [
+            (model_path, qa_dataset, max_tokens, temperature, eval_kwargs,
+             idx % n_gpus if n_gpus > 1 else None)
+            for idx, model_path in enumerate(model_paths)
+        ]
+
+        all_results = {}
+        with mp.get_context('spawn').Pool(num_workers) as pool:
+            for model_path, predicted_answers in pool.imap_unordered(_generation_worker, jobs):
+                all_results[model_path] = self.score_predictions(
+                    model_path, qa_dataset, predicted_answers, similarity_threshold,
+                    output_stream=output_stream)
+        return all_results
+
+    def print_results(self, all_results: Dict[str, List[EvaluationResult]],
                      similarity_threshold: float):
         """Print formatted evaluation results"""
         print(f"\n{'='*80}")
@@ -426,12 +1297,13 @@ class ModelEvaluation:
         
         for model_path, results in all_results.items():
             model_name = os.path.basename(model_path)
-            correct = sum(1 for r in results if r.correct)
+            scores, correct_mask = _score_arrays(results)
+            correct = int(correct_mask.sum())
             total = len(results)
-            accuracy = (correct / total * 100) if total > 0 else 0
-            mean_sim = statistics.mean(r.similarity_score for r in results)
-            median_sim = statistics.median(r.similarity_score for r in results)
-            
+            accuracy = correct_mask.mean() * 100 if total > 0 else 0
+            mean_sim = scores.mean()
+            median_sim = np.median(scores)
+
             print(f"\nModel: {model_name}")
             print(f"Threshold: {similarity_threshold}")
             print(f"-" * 80)
@@ -456,22 +1328,21 @@ class ModelEvaluation:
         
         for model_path, results in all_results.items():
             model_name = os.path.basename(model_path)
-            correct = sum(1 for r in results if r.correct)
+            scores, correct_mask = _score_arrays(results)
             total = len(results)
-            
+
             json_results[model_name] = {
-                'accuracy': (correct / total * 100) if total > 0 else 0,
-                'correct': correct,
+                'accuracy': float(correct_mask.mean() * 100) if total > 0 else 0,
+                'correct': int(correct_mask.sum()),
                 'total': total,
-                'mean_similarity': statistics.mean(r.similarity_score for r in results),
-                'median_similarity': statistics.median(r.similarity_score for r in results),
+                'mean_similarity': float(scores.mean()),
+                'median_similarity': float(np.median(scores)),
                 'similarity_threshold': similarity_threshold,
-                'results': [asdict(r) for r in results]
+                'results': results
             }
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(json_results, f, indent=2)
-        
+
+        _dump_json(json_results, output_file)
+
         print(f"\nResults saved to: {output_file}")
     
     def compare_models(self, all_results: Dict[str, List[EvaluationResult]]):
@@ -482,38 +1353,77 @@ class ModelEvaluation:
         
         print(f"{'Model':<40} {'Accuracy':<12} {'Mean Sim':<12}")
         print(f"-" * 80)
-        
-        # Sort by accuracy
+
+        # Compute each model's arrays once, then sort by accuracy
+        model_stats = {
+            model_path: _score_arrays(results)
+            for model_path, results in all_results.items()
+        }
         sorted_results = sorted(
-            all_results.items(),
-            key=lambda x: sum(1 for r in x[1] if r.correct) / len(x[1]),
+            all_results,
+            key=lambda model_path: model_stats[model_path][1].mean(),
             reverse=True
         )
-        
-        for model_path, results in sorted_results:
+
+        for model_path in sorted_results:
             model_name = os.path.basename(model_path)[:38]
-            correct = sum(1 for r in results if r.correct)
-            total = len(results)
-            accuracy = (correct / total * 100) if total > 0 else 0
-            mean_sim = statistics.mean(r.similarity_score for r in results)
-            
+            scores, correct_mask = model_stats[model_path]
+            accuracy = correct_mask.mean() * 100 if len(scores) > 0 else 0
+            mean_sim = scores.mean()
+
             print(f"{model_name:<40} {accuracy:>6.2f}%     {mean_sim:>6.3f}")
 
+def _benchmark_worker(args: tuple) -> tuple:
+    """Spawned pool worker: benchmark one model, optionally pinned to a GPU"""
+    model_path, prompts, max_tokens, temperature, rep_policy, bench_kwargs, device_idx = args
+    if device_idx is not None:
+        os.environ['CUDA_VISIBLE_DEVICES'] = str(device_idx)
+
+    min_reps, max_reps, target_stderr = rep_policy
+    benchmark = ModelBenchmark(**bench_kwargs)
+    results = benchmark.benchmark_model(
+        model_path, prompts, max_tokens, temperature,
+        min_reps=min_reps, max_reps=max_reps, target_stderr=target_stderr)
+    model_cache.evict(model_path)
+    return model_path, results
+
+def _generation_worker(args: tuple) -> tuple:
+    """
+    Spawned pool worker: generate one model's predictions on one device.
+
+    The worker never touches the sentence transformer (it loads lazily), so
+    it only pays for llama.cpp; scoring happens in the parent process.
+    """
+    model_path, qa_dataset, max_tokens, temperature, eval_kwargs, device_idx = args
+    if device_idx is not None:
+        os.environ['CUDA_VISIBLE_DEVICES'] = str(device_idx)
+
+    evaluator = ModelEvaluation(**eval_kwargs)
+    predicted_answers = evaluator.generate_predictions(
+        model_path, qa_dataset, max_tokens, temperature)
+    model_cache.evict(model_path)
+    return model_path, predicted_answers
+
 class MMLUEvaluation:
     """Evaluates models on MMLU (Massive Multitask Language Understanding) benchmark"""
     
-    def __init__(self, n_ctx: int = 2048, n_threads: int = 4, n_gpu_layers: int = 0):
+    def __init__(self, n_ctx: int = 2048, n_threads: int = 4, n_gpu_layers: int = -1,
+                 n_batch: Optional[int] = None):
         """
         Initialize MMLU evaluation configuration
-        
+
         Args:
             n_ctx: Context window size
             n_threads: Number of CPU threads
-            n_gpu_layers: Number of layers to offload to GPU (0 for CPU-only)
+            n_gpu_layers: Number of layers to offload to GPU (-1 for all,
+                0 for CPU-only; clamped to 0 on CPU-only builds)
+            n_batch: Prompt prefill batch size; defaults to min(n_ctx, 2048)
+                since MMLU prompts are prefill-dominated
         """
         self.n_ctx = n_ctx
         self.n_threads = n_threads
-        self.n_gpu_layers = n_gpu_layers
+        self.n_gpu_layers = resolve_n_gpu_layers(n_gpu_layers)
+        self.n_batch = n_batch if n_batch is not None else min(n_ctx, 2048)
     
     def load_mmlu_dataset(
         self, 
@@ -625,25 +1535,49 @@ Answer: """
         match = re.search(r'\b([ABCD])\b', response)
         if match:
             return match.group(1)
-        
+
         return ''
-    
+
+    def _score_completion_choice(self, choice: Dict) -> str:
+        """
+        Answer letter ranked highest in a single-token completion choice.
+
+        Compares the logprobs of the answer letters found among the top
+        next-token candidates; falls back to parsing the sampled text when
+        no letter made the top five.
+        """
+        logprobs = choice.get('logprobs') or {}
+        top_logprobs = (logprobs.get('top_logprobs') or [{}])[0]
+
+        letter_scores = {}
+        for token, logprob in top_logprobs.items():
+            letter = token.strip().upper()
+            if len(letter) == 1 and letter in 'ABCD':
+                letter_scores[letter] = max(letter_scores.get(letter, logprob), logprob)
+
+        if letter_scores:
+            return max(letter_scores, key=letter_scores.get)
+        return self.extract_answer(choice.get('text', '').strip())
+
     def evaluate_model(
         self,
         model_path: str,
         mmlu_data: Dict[str, List[Dict]],
-        max_tokens: int = 10,
         temperature: float = 0.0
     ) -> Dict[str, List[MMLUResult]]:
         """
         Evaluate a model on MMLU dataset.
-        
+
+        Answers are scored from the logits of a single forward pass: the
+        model only needs to rank the four answer letters as the next token,
+        so generating and parsing a multi-token response would pay for
+        decoder steps that carry no signal.
+
         Args:
             model_path: Path to GGUF model file
             mmlu_data: Dictionary of MMLU questions by subject
-            max_tokens: Maximum tokens to generate
-            temperature: Sampling temperature
-        
+            temperature: Sampling temperature for the fallback parse path
+
         Returns:
             Dictionary mapping subjects to lists of MMLUResult objects
         """
@@ -657,6 +1591,10 @@ Answer: """
             n_ctx=self.n_ctx,
             n_threads=self.n_threads,
             n_gpu_layers=self.n_gpu_layers,
+            n_batch=self.n_batch,
+            # create_completion refuses logprobs (used below for answer
+            # scoring) unless the context keeps logits for every token
+            logits_all=True,
             verbose=False
         )
         
@@ -677,17 +1615,18 @@ Answer: """
                 correct_idx = item['answer']
                 correct_letter = chr(65 + correct_idx)  # Convert 0-3 to A-D
                 
-                # Format prompt and generate answer
+                # Format prompt and rank the answer letters among the top
+                # next-token logprobs of one forward pass
                 prompt = self.format_mmlu_prompt(question, choices)
                 output = llm(
                     prompt,
-                    max_tokens=max_tokens,
+                    max_tokens=1,
+                    logprobs=5,
                     temperature=temperature,
                     echo=False
                 )
-                
-                response = output['choices'][0]['text'].strip()
-                predicted_letter = self.extract_answer(response)
+
+                predicted_letter = self._score_completion_choice(output['choices'][0])
                 
                 # Check if correct
                 is_correct = (predicted_letter == correct_letter)
@@ -726,7 +1665,150 @@ Answer: """
         print(f"{'='*80}")
         
         return all_results
-    
+
+    def evaluate_model_server(
+        self,
+        model_path: str,
+        mmlu_data: Dict[str, List[Dict]],
+        temperature: float = 0.0,
+        n_parallel: int = 8,
+        port: int = 8321
+    ) -> Dict[str, List[MMLUResult]]:
+        """
+        Evaluate a model through llama.cpp's native llama-server binary.
+
+        MMLU questions are independent single-forward-pass requests, and
+        llama-server with --parallel/--cont-batching decodes its slots
+        together through continuous batching, so keeping n_parallel requests
+        in flight genuinely overlaps their prompt evaluation. (The Python
+        llama_cpp.server wrapper would not help here: it serializes
+        completions behind a global lock.) Requires the aiohttp package and
+        a llama-server binary on PATH (or via LLAMA_SERVER_BIN); the server
+        subprocess is terminated when evaluation finishes.
+
+        Args:
+            model_path: Path to GGUF model file
+            mmlu_data: Dictionary of MMLU questions by subject
+            temperature: Sampling temperature for the fallback parse path
+            n_parallel: Server slot count and maximum in-flight requests
+            port: Local port for the server subprocess
+
+        Returns:
+            Dictionary mapping subjects to lists of MMLUResult objects
+        """
+        import asyncio
+        import shutil
+        import subprocess
+        import urllib.request
+        try:
+            import aiohttp
+        except ImportError:
+            print("Error: 'aiohttp' library not installed. Install with: pip install aiohttp")
+            return {}
+
+        server_bin = os.environ.get('LLAMA_SERVER_BIN') or shutil.which('llama-server')
+        if server_bin is None:
+            print("Error: 'llama-server' binary not found. Build it from llama.cpp "
+                  "or point LLAMA_SERVER_BIN at it.")
+            return {}
+
+        model_name = os.path.basename(model_path)
+        print(f"\n{'='*80}")
+        print(f"Starting server for model: {model_name}")
+        print(f"{'='*80}")
+
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [server_bin,
+             '--model', model_path,
+             # The context is shared across slots, so reserve a full
+             # window per concurrent request
+             '--ctx-size', str(self.n_ctx * n_parallel),
+             '--threads', str(self.n_threads),
+             # llama-server has no "all layers" sentinel like -1
+             '--n-gpu-layers', str(self.n_gpu_layers if self.n_gpu_layers >= 0 else 999),
+             '--batch-size', str(self.n_batch),
+             '--parallel', str(n_parallel),
+             '--cont-batching',
+             '--host', '127.0.0.1',
+             '--port', str(port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        try:
+            # Wait for /health to report the model finished loading (it
+            # returns 503 while the server is still warming up)
+            deadline = time.perf_counter() + 300
+            while True:
+                try:
+                    urllib.request.urlopen(f"{base_url}/health", timeout=1)
+                    break
+                except OSError:
+                    if server.poll() is not None:
+                        raise RuntimeError(f"llama-server exited while loading {model_path}")
+                    if time.perf_counter() > deadline:
+                        raise RuntimeError(f"llama-server did not come up for {model_path}")
+                    time.sleep(0.5)
+
+            async def run_all() -> Dict[str, List[str]]:
+                semaphore = asyncio.Semaphore(n_parallel)
+
+                async def ask(session, prompt):
+                    payload = {'prompt': prompt, 'max_tokens': 1,
+                               'logprobs': 5, 'temperature': temperature}
+                    async with semaphore:
+                        async with session.post(f"{base_url}/v1/completions",
+                                                json=payload) as resp:
+                            data = await resp.json()
+                    return self._score_completion_choice(data['choices'][0])
+
+                predictions = {}
+                async with aiohttp.ClientSession() as session:
+                    for subject, questions in mmlu_data.items():
+                        print(f"\nEvaluating subject: {subject} ({len(questions)} questions)")
+                        prompts = [self.format_mmlu_prompt(q['question'], q['choices'])
+                                   for q in questions]
+                        predictions[subject] = await asyncio.gather(
+                            *[ask(session, prompt) for prompt in prompts])
+                return predictions
+
+            predictions = asyncio.run(run_all())
+        finally:
+            server.terminate()
+            server.wait()
+
+        all_results = {}
+        total_correct = 0
+        total_questions = 0
+
+        for subject, questions in mmlu_data.items():
+            subject_results = []
+            for item, predicted_letter in zip(questions, predictions[subject]):
+                correct_letter = chr(65 + item['answer'])
+                is_correct = (predicted_letter == correct_letter)
+                if is_correct:
+                    total_correct += 1
+                total_questions += 1
+
+                subject_results.append(MMLUResult(
+                    model_name=model_name,
+                    subject=subject,
+                    question=item['question'],
+                    choices=item['choices'],
+                    correct_answer=correct_letter,
+                    predicted_answer=predicted_letter,
+                    correct=is_correct
+                ))
+            all_results[subject] = subject_results
+
+        overall_acc = (total_correct / total_questions * 100) if total_questions > 0 else 0
+        print(f"\n{'='*80}")
+        print(f"Overall Accuracy: {overall_acc:.2f}% ({total_correct}/{total_questions})")
+        print(f"{'='*80}")
+
+        return all_results
+
     def print_results(self, all_model_results: Dict[str, Dict[str, List[MMLUResult]]]):
         """Print formatted MMLU results"""
         print(f"\n{'='*80}")
@@ -787,7 +1869,7 @@ Answer: """
                     'correct': correct,
                     'total': total,
                     'accuracy': accuracy,
-                    'results': [asdict(r) for r in results]
+                    'results': results
                 }
             
             # Overall statistics
@@ -799,10 +1881,9 @@ Answer: """
             }
             
             json_results[model_name] = model_data
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(json_results, f, indent=2)
-        
+
+        _dump_json(json_results, output_file)
+
         print(f"\nResults saved to: {output_file}")
     
     def compare_models(self, all_model_results: Dict[str, Dict[str, List[MMLUResult]]]):
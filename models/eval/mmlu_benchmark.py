@@ -3,7 +3,7 @@ GGUF Model MMLU Benchmark Script with llama-cpp-python
 Evaluates models on the Massive Multitask Language Understanding (MMLU) benchmark
 """
 import os
-from benchmark_utils import MMLUEvaluation, get_model_paths
+from benchmark_utils import MMLUEvaluation, get_model_paths, validate_and_size_models
 
 def main():
     """Run MMLU benchmark on models"""
@@ -15,7 +15,9 @@ def main():
     evaluator = MMLUEvaluation(
         n_ctx=2048,
         n_threads=4,
-        n_gpu_layers=0,  # Set to 35 or more for GPU acceleration
+        # Offload all layers by default (clamped to 0 on CPU-only builds);
+        # override with e.g. N_GPU_LAYERS=0 to force CPU inference
+        n_gpu_layers=int(os.environ.get("N_GPU_LAYERS", "-1")),
     )
 
     # Download and load MMLU dataset
@@ -27,25 +29,39 @@ def main():
     )
     print(f"Loaded {sum(len(qs) for qs in mmlu_data.values())} questions from {len(mmlu_data)} subjects\n")
 
-    # Evaluation settings
-    max_tokens = 10  # MMLU only needs single letter response
+    # Evaluation settings: answers are scored from one forward pass's
+    # logits, so there is no generation length to configure
     temperature = 0.0  # Deterministic answers for consistency
 
-    # Run evaluation on all models
+    # Run evaluation on all models that exist on disk (stats run
+    # concurrently and missing entries are warned about up front)
+    models = [path for path, _ in validate_and_size_models(models)]
+
+    # With MMLU_PARALLEL > 1, questions go through the llama.cpp HTTP
+    # server with that many requests in flight instead of a Python loop
+    n_parallel = int(os.environ.get("MMLU_PARALLEL", "1"))
+
     all_results = {}
     for model_path in models:
-        if not os.path.exists(model_path):
-            print(f"Warning: Model not found: {model_path}")
-            continue
-        
-        results = evaluator.evaluate_model(
-            model_path=model_path,
-            mmlu_data=mmlu_data,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
+        if n_parallel > 1:
+            results = evaluator.evaluate_model_server(
+                model_path=model_path,
+                mmlu_data=mmlu_data,
+                temperature=temperature,
+                n_parallel=n_parallel
+            )
+        else:
+            results = evaluator.evaluate_model(
+                model_path=model_path,
+                mmlu_data=mmlu_data,
+                temperature=temperature
+            )
         all_results[model_path] = results
-    
+
+        # Rewrite the results file after every model so a crash later in
+        # the sweep doesn't lose the completed ones
+        evaluator.save_results(all_results, "mmlu_results.json")
+
     # Display results
     evaluator.print_results(all_results)
     evaluator.compare_models(all_results)
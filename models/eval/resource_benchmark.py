@@ -3,7 +3,7 @@ GGUF Model Benchmarking Script with llama-cpp-python
 Measures TTFT, generation speed, memory usage, and more
 """
 import os
-from benchmark_utils import ModelBenchmark, get_model_paths
+from benchmark_utils import ModelBenchmark, get_model_paths, model_cache, validate_and_size_models
 
 def main():
     """Run resource benchmark on models"""
@@ -21,24 +21,46 @@ def main():
     benchmark = ModelBenchmark(
         n_ctx=2048,
         n_threads=4,
-        n_gpu_layers=0  # Set to 35 or more for GPU acceleration
+        # Offload all layers by default (clamped to 0 on CPU-only builds);
+        # override with e.g. N_GPU_LAYERS=0 to force CPU inference
+        n_gpu_layers=int(os.environ.get("N_GPU_LAYERS", "-1")),
+        n_batch=2048  # Prefill long prompts in a single forward pass
     )
     
-    # Run benchmarks
-    all_results = {}
-    for model_path in models:
-        if not os.path.exists(model_path):
-            print(f"Warning: Model not found: {model_path}")
-            continue
-        
-        results = benchmark.benchmark_model(
-            model_path=model_path,
+    # Run benchmarks on all models that exist on disk (stats run
+    # concurrently and missing entries are warned about up front)
+    models = [path for path, _ in validate_and_size_models(models)]
+
+    # With BENCH_WORKERS > 1, models run concurrently in worker processes
+    # (one per GPU on multi-GPU machines)
+    num_workers = int(os.environ.get("BENCH_WORKERS", "1"))
+    if num_workers > 1:
+        all_results = benchmark.benchmark_models_parallel(
+            model_paths=models,
             prompts=prompts,
             max_tokens=128,
             temperature=0.7,
-            repetitions=3
+            num_workers=num_workers
         )
-        all_results[model_path] = results
+    else:
+        all_results = {}
+        for model_path in models:
+            # Repetitions stop early once tokens/sec stabilizes (between
+            # min_reps=2 and max_reps=5 by default)
+            results = benchmark.benchmark_model(
+                model_path=model_path,
+                prompts=prompts,
+                max_tokens=128,
+                temperature=0.7
+            )
+            all_results[model_path] = results
+
+            # Rewrite the results file after every model so a crash later
+            # in the sweep doesn't lose the completed ones
+            benchmark.save_results(all_results, "benchmark_results.json")
+
+            # Free this model's RAM before loading the next one
+            model_cache.evict(model_path)
     
     # Display results
     benchmark.print_results(all_results)